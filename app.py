@@ -1,46 +1,200 @@
 """Main Flask application for the Recipe Manager."""
 
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+import orjson
+from datetime import datetime
+from flask import Flask, render_template, request, redirect, url_for, flash, Response, stream_with_context, make_response, session
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
+from sqlalchemy import event
+from sqlalchemy.orm import defer, joinedload
 from models import db, Recipe, Ingredient, CATEGORIES, UNITS
 
+class ORJSONProvider(DefaultJSONProvider):
+    """App-wide JSON provider backed by orjson.
+
+    3-5x faster than the stdlib encoder and handles datetimes natively;
+    benefits jsonify and Jinja's tojson filter alike.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///recipes.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'connect_args': {'check_same_thread': False},
+    }
+else:
+    # Enough pooled connections for concurrent Gunicorn workers, with
+    # pre-ping so stale connections don't stall requests
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': 20,
+        'max_overflow': 10,
+        'pool_pre_ping': True,
+        'pool_recycle': 3600,
+    }
+
 db.init_app(app)
 
+# Recomputes a recipe's full-text search vector from the ingredient table.
+# Used for the startup backfill and after bulk ingredient writes, which
+# bypass the relationship the model event reads from.
+_SEARCH_VECTOR_SQL = (
+    "UPDATE recipe SET search_vector = to_tsvector('english', "
+    "coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || "
+    "coalesce((SELECT string_agg(name, ' ') FROM ingredient "
+    "WHERE ingredient.recipe_id = recipe.id), ''))"
+)
+
+# In-memory cache by default; point CACHE_REDIS_URL at a Redis instance
+# in production so Gunicorn workers share one cache.
+cache = Cache(app, config={
+    'CACHE_TYPE': 'RedisCache' if os.environ.get('CACHE_REDIS_URL') else 'SimpleCache',
+    'CACHE_REDIS_URL': os.environ.get('CACHE_REDIS_URL'),
+})
+
 # Create tables on first run
 with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        # WAL + relaxed fsync make SQLite commits ~5-10x cheaper; the
+        # defaults (rollback journal, synchronous=FULL) fsync per commit
+        @event.listens_for(db.engine, 'connect')
+        def _sqlite_pragmas(dbapi_conn, _record):
+            cur = dbapi_conn.cursor()
+            cur.execute('PRAGMA journal_mode=WAL')
+            cur.execute('PRAGMA synchronous=NORMAL')
+            cur.execute('PRAGMA mmap_size=268435456')
+            cur.execute('PRAGMA cache_size=-64000')
+            cur.close()
+
     db.create_all()
 
+    if db.engine.dialect.name == 'postgresql':
+        # db.create_all() only creates missing tables, never new columns,
+        # so bring pre-existing databases up to the current schema before
+        # the index/backfill statements below (no migration framework here)
+        db.session.execute(db.text(
+            'ALTER TABLE recipe ADD COLUMN IF NOT EXISTS search_vector tsvector'
+        ))
+        db.session.execute(db.text(
+            'ALTER TABLE recipe ADD COLUMN IF NOT EXISTS total_time integer '
+            'GENERATED ALWAYS AS (coalesce(prep_time, 0) + coalesce(cook_time, 0)) STORED'
+        ))
+        db.session.execute(db.text(
+            'ALTER TABLE ingredient ADD COLUMN IF NOT EXISTS name_lower varchar(100) '
+            'GENERATED ALWAYS AS (lower(name)) STORED'
+        ))
+        db.session.execute(db.text(
+            'CREATE INDEX IF NOT EXISTS ix_recipe_total_time ON recipe (total_time)'
+        ))
+        db.session.execute(db.text(
+            'CREATE INDEX IF NOT EXISTS ix_ingredient_name_lower ON ingredient (name_lower)'
+        ))
+        # GIN index for full-text search, plus a backfill for rows created
+        # before the search vector existed.
+        db.session.execute(db.text(
+            'CREATE INDEX IF NOT EXISTS recipe_search_idx '
+            'ON recipe USING gin (search_vector)'
+        ))
+        db.session.execute(db.text(_SEARCH_VECTOR_SQL + ' WHERE search_vector IS NULL'))
+        # Trigram indexes for fuzzy/substring matching when full-text
+        # search comes up short ("tomat" should still find "tomatoes").
+        db.session.execute(db.text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        db.session.execute(db.text(
+            'CREATE INDEX IF NOT EXISTS recipe_title_trgm '
+            'ON recipe USING gin (title gin_trgm_ops)'
+        ))
+        db.session.execute(db.text(
+            'CREATE INDEX IF NOT EXISTS ingredient_name_trgm '
+            'ON ingredient USING gin (name gin_trgm_ops)'
+        ))
+        db.session.commit()
+
+
+def _index_cache_key():
+    """Cache key for the home page: query params + catalog fingerprint.
+
+    MAX(updated_at) changes whenever any recipe is created or edited and
+    COUNT(*) changes on deletes, so one indexed lookup rolls the key for
+    every kind of write and handlers never invalidate manually.
+    """
+    last_edit, count = db.session.query(
+        db.func.max(Recipe.updated_at), db.func.count(Recipe.id)).one()
+    return (f"idx:{request.args.get('search', '').strip()}"
+            f":{request.args.get('category', '')}"
+            f":{request.args.get('page', 1, type=int)}:{count}:{last_edit}")
+
 
 @app.route('/')
+# Bypass the cache when flashes are pending: the rendered page embeds
+# them, and caching one would re-serve a user's one-time message to
+# everyone (or swallow it on a hit)
+@cache.cached(timeout=60, make_cache_key=_index_cache_key,
+              unless=lambda: bool(session.get('_flashes')))
 def index():
     """Home page - list all recipes with search and filter."""
     search = request.args.get('search', '').strip()
     category = request.args.get('category', '')
+    page = request.args.get('page', 1, type=int)
 
-    query = Recipe.query
+    # Recipe cards never show instructions; skip fetching the blobs
+    query = Recipe.query.options(defer(Recipe.instructions))
 
     if search:
-        # Search in title and ingredients
-        query = query.outerjoin(Ingredient).filter(
-            db.or_(
-                Recipe.title.ilike(f'%{search}%'),
-                Recipe.description.ilike(f'%{search}%'),
-                Ingredient.name.ilike(f'%{search}%')
-            )
-        ).distinct()
+        if db.engine.dialect.name == 'postgresql':
+            # Index-driven full-text search over title, description and
+            # ingredient names (see Recipe.search_vector).
+            query = query.filter(Recipe.search_vector.op('@@')(
+                db.func.websearch_to_tsquery('english', search)
+            ))
+        else:
+            # SQLite fallback: scan title and ingredients with ILIKE
+            query = query.outerjoin(Ingredient).filter(
+                db.or_(
+                    Recipe.title.ilike(f'%{search}%'),
+                    Recipe.description.ilike(f'%{search}%'),
+                    Ingredient.name.ilike(f'%{search}%')
+                )
+            ).distinct()
 
     if category:
         query = query.filter(Recipe.category == category)
 
-    recipes = query.order_by(Recipe.updated_at.desc()).all()
+    pagination = (query.order_by(Recipe.updated_at.desc())
+                  .paginate(page=page, per_page=50, error_out=False))
+    recipes = pagination.items
+
+    if search and page == 1 and len(recipes) < 5 and db.engine.dialect.name == 'postgresql':
+        # Full-text search misses substrings and typos; fall back to the
+        # trigram indexes and append similar recipes we don't already have.
+        seen = {r.id for r in recipes}
+        ingredient_match = db.session.query(Ingredient.recipe_id).filter(
+            Ingredient.name.op('%')(search)
+        )
+        fuzzy = Recipe.query.options(defer(Recipe.instructions)).filter(
+            db.or_(
+                Recipe.title.op('%')(search),
+                Recipe.id.in_(ingredient_match)
+            )
+        )
+        if category:
+            fuzzy = fuzzy.filter(Recipe.category == category)
+        fuzzy = fuzzy.order_by(db.func.similarity(Recipe.title, search).desc())
+        recipes.extend(r for r in fuzzy.all() if r.id not in seen)
 
     return render_template('index.html',
                          recipes=recipes,
+                         pagination=pagination,
                          categories=CATEGORIES,
                          search=search,
                          selected_category=category)
@@ -49,51 +203,87 @@ def index():
 @app.route('/recipe/<int:id>')
 def view_recipe(id):
     """View a single recipe with optional serving adjustment."""
-    recipe = Recipe.query.get_or_404(id)
+    # Single recipe: one JOINed query beats the selectin default's two
+    recipe = Recipe.query.options(joinedload(Recipe.ingredients)).get_or_404(id)
+
+    # The page only changes when the recipe is edited; skip rendering
+    # entirely when the browser's copy is still current
+    last_modified = recipe.updated_at or recipe.created_at
+    ims = request.if_modified_since
+    if last_modified and ims and ims.replace(tzinfo=None) >= last_modified.replace(microsecond=0):
+        return '', 304
+
     servings = request.args.get('servings', recipe.servings, type=int)
     multiplier = servings / recipe.servings if recipe.servings else 1
 
     scaled_ingredients = [ing.scaled(multiplier) for ing in recipe.ingredients]
 
-    return render_template('recipe.html',
-                         recipe=recipe,
-                         servings=servings,
-                         scaled_ingredients=scaled_ingredients)
+    resp = make_response(render_template('recipe.html',
+                                         recipe=recipe,
+                                         servings=servings,
+                                         scaled_ingredients=scaled_ingredients))
+
+    if last_modified:
+        resp.last_modified = last_modified
+        resp.set_etag(f'{recipe.id}-{int(last_modified.timestamp())}')
+    return resp.make_conditional(request)
+
+
+def _parse_recipe_form(form):
+    """Parse the recipe's scalar fields from a submitted form.
+
+    Shared by the create and edit handlers, which previously duplicated
+    the per-field get/cast logic.
+    """
+    def optint(key):
+        return int(form[key]) if form.get(key) else None
+
+    def optfloat(key):
+        return float(form[key]) if form.get(key) else None
+
+    return {
+        'title': form['title'],
+        'description': form.get('description', ''),
+        'category': form.get('category', 'Dinner'),
+        'servings': int(form.get('servings', 4)),
+        'prep_time': optint('prep_time'),
+        'cook_time': optint('cook_time'),
+        'instructions': form.get('instructions', ''),
+        'calories': optint('calories'),
+        'protein': optfloat('protein'),
+        'carbs': optfloat('carbs'),
+        'fat': optfloat('fat'),
+    }
+
+
+def _bulk_insert_ingredients(recipe_id, form):
+    """Insert a recipe's ingredients with a single multi-row INSERT."""
+    names = form.getlist('ingredient_name[]')
+    amounts = form.getlist('ingredient_amount[]')
+    units = form.getlist('ingredient_unit[]')
+    rows = [
+        {'recipe_id': recipe_id, 'name': name.strip(),
+         'amount': float(amount) if amount else None, 'unit': unit}
+        for name, amount, unit in zip(names, amounts, units)
+        if name.strip()
+    ]
+    if rows:
+        db.session.execute(Ingredient.__table__.insert(), rows)
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(db.text(_SEARCH_VECTOR_SQL + ' WHERE id = :id'),
+                           {'id': recipe_id})
 
 
 @app.route('/recipe/new', methods=['GET', 'POST'])
 def new_recipe():
     """Create a new recipe."""
     if request.method == 'POST':
-        recipe = Recipe(
-            title=request.form['title'],
-            description=request.form.get('description', ''),
-            category=request.form.get('category', 'Dinner'),
-            servings=int(request.form.get('servings', 4)),
-            prep_time=int(request.form['prep_time']) if request.form.get('prep_time') else None,
-            cook_time=int(request.form['cook_time']) if request.form.get('cook_time') else None,
-            instructions=request.form.get('instructions', ''),
-            calories=int(request.form['calories']) if request.form.get('calories') else None,
-            protein=float(request.form['protein']) if request.form.get('protein') else None,
-            carbs=float(request.form['carbs']) if request.form.get('carbs') else None,
-            fat=float(request.form['fat']) if request.form.get('fat') else None
-        )
-
-        # Add ingredients
-        names = request.form.getlist('ingredient_name[]')
-        amounts = request.form.getlist('ingredient_amount[]')
-        units = request.form.getlist('ingredient_unit[]')
-
-        for name, amount, unit in zip(names, amounts, units):
-            if name.strip():
-                ingredient = Ingredient(
-                    name=name.strip(),
-                    amount=float(amount) if amount else None,
-                    unit=unit
-                )
-                recipe.ingredients.append(ingredient)
+        recipe = Recipe(**_parse_recipe_form(request.form))
 
         db.session.add(recipe)
+        db.session.flush()  # assign recipe.id for the ingredient rows
+
+        _bulk_insert_ingredients(recipe.id, request.form)
         db.session.commit()
         flash(f'Recipe "{recipe.title}" created!', 'success')
         return redirect(url_for('view_recipe', id=recipe.id))
@@ -110,34 +300,20 @@ def edit_recipe(id):
     recipe = Recipe.query.get_or_404(id)
 
     if request.method == 'POST':
-        recipe.title = request.form['title']
-        recipe.description = request.form.get('description', '')
-        recipe.category = request.form.get('category', 'Dinner')
-        recipe.servings = int(request.form.get('servings', 4))
-        recipe.prep_time = int(request.form['prep_time']) if request.form.get('prep_time') else None
-        recipe.cook_time = int(request.form['cook_time']) if request.form.get('cook_time') else None
-        recipe.instructions = request.form.get('instructions', '')
-        recipe.calories = int(request.form['calories']) if request.form.get('calories') else None
-        recipe.protein = float(request.form['protein']) if request.form.get('protein') else None
-        recipe.carbs = float(request.form['carbs']) if request.form.get('carbs') else None
-        recipe.fat = float(request.form['fat']) if request.form.get('fat') else None
-
-        # Clear existing ingredients and re-add
-        recipe.ingredients.clear()
-
-        names = request.form.getlist('ingredient_name[]')
-        amounts = request.form.getlist('ingredient_amount[]')
-        units = request.form.getlist('ingredient_unit[]')
-
-        for name, amount, unit in zip(names, amounts, units):
-            if name.strip():
-                ingredient = Ingredient(
-                    name=name.strip(),
-                    amount=float(amount) if amount else None,
-                    unit=unit
-                )
-                recipe.ingredients.append(ingredient)
-
+        for field, value in _parse_recipe_form(request.form).items():
+            setattr(recipe, field, value)
+
+        # Bump updated_at explicitly: an ingredient-only edit issues no
+        # recipe UPDATE (onupdate never fires), which would leave the
+        # page's validators and the home-page cache key stale
+        recipe.updated_at = datetime.utcnow()
+
+        # Replace all ingredients: one DELETE + one multi-row INSERT
+        # instead of a DELETE and INSERT per row
+        db.session.execute(
+            Ingredient.__table__.delete().where(Ingredient.recipe_id == recipe.id)
+        )
+        _bulk_insert_ingredients(recipe.id, request.form)
         db.session.commit()
         flash(f'Recipe "{recipe.title}" updated!', 'success')
         return redirect(url_for('view_recipe', id=recipe.id))
@@ -159,10 +335,77 @@ def delete_recipe(id):
     return redirect(url_for('index'))
 
 
+def _aggregate_shopping_items(selected_ids, servings_map):
+    """Aggregate scaled ingredient amounts for the selected recipes in SQL.
+
+    One GROUP BY over (lowercased name, unit) replaces the old per-recipe
+    Python loop, with per-recipe serving multipliers fed in via a CTE.
+    Results come back ordered by the stored name_lower column, so no
+    Python-side sort (or per-comparison lower()) is needed.
+    """
+    if not selected_ids:
+        return []
+
+    # Scale factors need each recipe's stored serving count
+    servings = dict(db.session.query(Recipe.id, Recipe.servings)
+                    .filter(Recipe.id.in_(selected_ids)).all())
+    multipliers = {
+        rid: servings_map[rid] / servings[rid] if servings.get(rid) else 1
+        for rid in selected_ids if rid in servings
+    }
+    if not multipliers:
+        return []
+
+    mult_rows = [
+        db.select(db.literal(rid).label('rid'), db.literal(mult).label('mult'))
+        for rid, mult in multipliers.items()
+    ]
+    mult_cte = mult_rows[0].union_all(*mult_rows[1:]).cte('multipliers')
+
+    if db.engine.dialect.name == 'postgresql':
+        titles_agg = db.func.array_agg(Recipe.title.distinct())
+    else:
+        # SQLite's group_concat(DISTINCT ...) can't take a separator and
+        # the default comma breaks on titles like "Quick, Easy Pasta";
+        # join on the unit separator and dedupe in Python instead
+        titles_agg = db.func.group_concat(Recipe.title, '\x1f')
+
+    rows = (db.session.query(
+                db.func.min(Ingredient.name).label('name'),
+                db.func.coalesce(Ingredient.unit, '').label('unit'),
+                db.func.sum(db.func.coalesce(Ingredient.amount, 0) * mult_cte.c.mult).label('amount'),
+                titles_agg.label('recipes'))
+            .join(Recipe, Recipe.id == Ingredient.recipe_id)
+            .join(mult_cte, mult_cte.c.rid == Ingredient.recipe_id)
+            .group_by(Ingredient.name_lower, db.func.coalesce(Ingredient.unit, ''))
+            .order_by(Ingredient.name_lower)
+            .all())
+
+    def titles(value):
+        if isinstance(value, list):
+            return value
+        return list(dict.fromkeys(value.split('\x1f')))
+
+    return [
+        {
+            'name': row.name,
+            'amount': row.amount,
+            'unit': row.unit,
+            'recipes': titles(row.recipes)
+        }
+        for row in rows
+    ]
+
+
 @app.route('/shopping-list', methods=['GET', 'POST'])
 def shopping_list():
     """Generate a shopping list from selected recipes."""
-    recipes = Recipe.query.order_by(Recipe.title).all()
+    # The checkbox list only renders id/title/category/servings; plain
+    # column rows skip hydrating full recipes and their ingredients
+    recipes = db.session.execute(
+        db.select(Recipe.id, Recipe.title, Recipe.category, Recipe.servings)
+        .order_by(Recipe.title)
+    ).all()
     shopping_items = []
     selected_ids = []
 
@@ -173,31 +416,7 @@ def shopping_list():
         for recipe_id in selected_ids:
             servings_map[recipe_id] = int(request.form.get(f'servings_{recipe_id}', 4))
 
-        # Aggregate ingredients
-        ingredient_totals = {}
-
-        for recipe_id in selected_ids:
-            recipe = Recipe.query.get(recipe_id)
-            if recipe:
-                multiplier = servings_map[recipe_id] / recipe.servings if recipe.servings else 1
-
-                for ing in recipe.ingredients:
-                    key = (ing.name.lower(), ing.unit or '')
-                    scaled_amount = (ing.amount or 0) * multiplier
-
-                    if key in ingredient_totals:
-                        ingredient_totals[key]['amount'] += scaled_amount
-                        ingredient_totals[key]['recipes'].append(recipe.title)
-                    else:
-                        ingredient_totals[key] = {
-                            'name': ing.name,
-                            'amount': scaled_amount,
-                            'unit': ing.unit or '',
-                            'recipes': [recipe.title]
-                        }
-
-        # Sort by ingredient name
-        shopping_items = sorted(ingredient_totals.values(), key=lambda x: x['name'].lower())
+        shopping_items = _aggregate_shopping_items(selected_ids, servings_map)
 
     return render_template('shopping.html',
                          recipes=recipes,
@@ -205,11 +424,84 @@ def shopping_list():
                          selected_ids=selected_ids)
 
 
+def _json_array_stream(chunks):
+    """Yield a JSON array from encoded elements without building the whole payload."""
+    yield b'['
+    first = True
+    for chunk in chunks:
+        yield chunk if first else b',' + chunk
+        first = False
+    yield b']'
+
+
+def _stream_recipes_json(limit, after_id):
+    """Yield the /api/recipes payload as JSON chunks.
+
+    Runs inside the streamed response (not the view) so the query uses
+    the streaming context's session and rows are encoded as the cursor
+    produces them. Pages by keyset on id (WHERE id > after_id LIMIT n),
+    which stays an index scan at any depth, unlike OFFSET.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        # Build the recipe objects (with nested ingredients) inside
+        # Postgres with jsonb_agg: one round-trip, no ORM hydration.
+        sql = db.text("""
+            SELECT jsonb_build_object(
+                'id', r.id, 'title', r.title, 'description', r.description,
+                'category', r.category, 'servings', r.servings,
+                'prep_time', r.prep_time, 'cook_time', r.cook_time,
+                'instructions', r.instructions, 'calories', r.calories,
+                'protein', r.protein, 'carbs', r.carbs, 'fat', r.fat,
+                'ingredients', coalesce(
+                    jsonb_agg(jsonb_build_object(
+                        'id', i.id, 'name', i.name,
+                        'amount', i.amount, 'unit', i.unit
+                    ) ORDER BY i.id) FILTER (WHERE i.id IS NOT NULL),
+                    '[]'::jsonb
+                )
+            )
+            FROM recipe r
+            LEFT JOIN ingredient i ON i.recipe_id = r.id
+            WHERE r.id > :after_id
+            GROUP BY r.id
+            ORDER BY r.id
+            LIMIT :limit
+        """)
+        rows = db.session.execute(
+            sql.execution_options(stream_results=True, yield_per=500),
+            {'after_id': after_id, 'limit': limit}
+        ).scalars()
+        chunks = (orjson.dumps(row) for row in rows)
+    else:
+        rows = db.session.execute(
+            db.select(Recipe)
+            .where(Recipe.id > after_id)
+            .order_by(Recipe.id)
+            .limit(limit)
+            .execution_options(yield_per=500)
+        ).scalars()
+        chunks = (orjson.dumps(r.to_dict()) for r in rows)
+
+    yield from _json_array_stream(chunks)
+
+
 @app.route('/api/recipes')
 def api_recipes():
-    """JSON API endpoint for recipes."""
-    recipes = Recipe.query.all()
-    return jsonify([r.to_dict() for r in recipes])
+    """JSON API endpoint for recipes.
+
+    Paginated: returns up to `limit` recipes (default 100, max 500) with
+    id greater than `after_id`. Clients pass the last id they received
+    to fetch the next page; a short page means there are no more.
+    """
+    # Clamp both ends: a negative LIMIT means "no limit" on SQLite and
+    # errors mid-stream on Postgres
+    limit = max(1, min(request.args.get('limit', 100, type=int), 500))
+    after_id = max(0, request.args.get('after_id', 0, type=int))
+
+    # Stream chunks as cursor rows arrive so peak memory stays flat no
+    # matter how many recipes exist
+    return Response(stream_with_context(_stream_recipes_json(limit, after_id)),
+                    mimetype='application/json')
 
 
 if __name__ == '__main__':
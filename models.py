@@ -1,6 +1,8 @@
 """Database models for the recipe manager."""
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -16,6 +18,11 @@ class Recipe(db.Model):
     servings = db.Column(db.Integer, default=4)
     prep_time = db.Column(db.Integer)  # minutes
     cook_time = db.Column(db.Integer)  # minutes
+
+    # Kept in the database as a generated column so it can be indexed
+    # and filtered on ("quick meals") without Python-side arithmetic
+    total_time = db.Column(db.Integer, db.Computed(
+        'coalesce(prep_time, 0) + coalesce(cook_time, 0)', persisted=True))
     instructions = db.Column(db.Text)
 
     # Macros per serving
@@ -27,14 +34,20 @@ class Recipe(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    ingredients = db.relationship('Ingredient', backref='recipe', lazy=True, cascade='all, delete-orphan')
+    # Full-text search vector over title + description + ingredient names.
+    # Only populated (and GIN-indexed) on PostgreSQL; stays NULL on SQLite.
+    # Deferred: queried via the index, never read in Python.
+    search_vector = db.deferred(db.Column(db.Text().with_variant(TSVECTOR(), 'postgresql')))
+
+    # The home page filters by category and sorts by updated_at DESC;
+    # matching indexes turn that into an index-range scan with no sort step.
+    __table_args__ = (
+        db.Index('ix_recipe_category_updated', category, updated_at.desc()),
+        db.Index('ix_recipe_updated', updated_at.desc()),
+        db.Index('ix_recipe_total_time', total_time),
+    )
 
-    @property
-    def total_time(self):
-        """Total prep + cook time."""
-        prep = self.prep_time or 0
-        cook = self.cook_time or 0
-        return prep + cook
+    ingredients = db.relationship('Ingredient', backref='recipe', lazy='selectin', cascade='all, delete-orphan')
 
     def to_dict(self):
         return {
@@ -58,8 +71,11 @@ class Ingredient(db.Model):
     """An ingredient for a recipe."""
 
     id = db.Column(db.Integer, primary_key=True)
-    recipe_id = db.Column(db.Integer, db.ForeignKey('recipe.id'), nullable=False)
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipe.id'), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
+    # Generated lowercase key so shopping-list grouping hits an index
+    # instead of lowercasing every row per query
+    name_lower = db.Column(db.String(100), db.Computed('lower(name)', persisted=True), index=True)
     amount = db.Column(db.Float)
     unit = db.Column(db.String(30))
 
@@ -80,6 +96,19 @@ class Ingredient(db.Model):
         }
 
 
+@event.listens_for(Recipe, 'before_insert')
+@event.listens_for(Recipe, 'before_update')
+def _update_search_vector(mapper, connection, target):
+    """Keep the search vector in sync with title, description and ingredients."""
+    if connection.dialect.name != 'postgresql':
+        return
+    ingredient_names = ' '.join(i.name for i in target.ingredients if i.name)
+    target.search_vector = db.func.to_tsvector(
+        'english',
+        (target.title or '') + ' ' + (target.description or '') + ' ' + ingredient_names
+    )
+
+
 # Category options
 CATEGORIES = ['Breakfast', 'Lunch', 'Dinner', 'Dessert', 'Snack', 'Drink', 'Side']
 